@@ -3,13 +3,13 @@ import os
 import sys
 import time
 import traceback
-import requests
+import aiohttp
 from dataclasses import dataclass, field
 from typing import List, Optional
 
 
 
-HTTP_TIMEOUT = 6 * 60 * 60
+AIOHTTP_TIMEOUT = aiohttp.ClientTimeout(total=6 * 60 * 60)
 
 @dataclass
 class RequestFuncInput:
@@ -30,6 +30,9 @@ class RequestFuncOutput:
     ttft: float = 0.0  # Time to first token
     itl: List[float] = field(
         default_factory=list)  # List of inter-token latencies
+    # Number of tokens observed on the stream; 0 if the backend does not
+    # stream, in which case the text must be re-tokenized to count tokens.
+    output_token_count: int = 0
     prompt_len: int = 0
     error: str = ""
 
@@ -40,8 +43,9 @@ def remove_prefix(text: str, prefix: str) -> str:
         return text[len(prefix):]
     return text
 
-def request_openai_completions(
+async def request_openai_completions(
     request_func_input: RequestFuncInput,
+    session: aiohttp.ClientSession,
 ) -> RequestFuncOutput:
     api_url = request_func_input.api_url
     assert api_url.endswith(
@@ -71,15 +75,15 @@ def request_openai_completions(
     st = time.perf_counter()
     most_recent_timestamp = st
     try:
-        with requests.post(url=api_url, json=payload, 
-                           headers=headers, stream=True,
-                           timeout=HTTP_TIMEOUT) as response:
-            if response.status_code == 200:
-                for chunk in response.iter_lines():
-                    chunk = chunk.strip()
-                    if not chunk:
+        async with session.post(url=api_url, json=payload,
+                                headers=headers) as response:
+            if response.status == 200:
+                async for chunk_bytes in response.content:
+                    chunk_bytes = chunk_bytes.strip()
+                    if not chunk_bytes:
                         continue
-                    chunk = remove_prefix(chunk.decode("utf-8"), "data: ")
+                    chunk = remove_prefix(chunk_bytes.decode("utf-8"),
+                                          "data: ")
                     
                     if chunk == "[DONE]":
                         latency = time.perf_counter() - st
@@ -103,6 +107,7 @@ def request_openai_completions(
 
                             most_recent_timestamp = timestamp
                             generated_text += data["choices"][0]["text"]
+                            output.output_token_count += 1
 
                 output.generated_text = generated_text
                 output.success = True
@@ -17,25 +17,82 @@ On the client side, run:
         --num-prompts <num_prompts> # By default <num_prompts> is 1000
 """
 import argparse
-import threading
-import json
+import asyncio
+import math
 import os
 import random
 import time
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import AsyncGenerator, List, Optional, Tuple
+from typing import AsyncGenerator, List, Optional, Sequence, Tuple
 
+import aiohttp
 import numpy as np
-from backend_request_func import (REQUEST_FUNCS, RequestFuncInput, RequestFuncOutput)
+import orjson
+from tqdm import tqdm
+from backend_request_func import (AIOHTTP_TIMEOUT, REQUEST_FUNCS,
+                                  RequestFuncInput, RequestFuncOutput)
 from transformers import PreTrainedTokenizerBase
 
 from vllm.transformers_utils.tokenizer import get_tokenizer
 
+try:
+    # Optional: constant-memory latency aggregation for very large runs.
+    # The PyPI package is named hdrhistogram but installs the hdrh module.
+    from hdrh.histogram import HdrHistogram
+except ImportError:
+    HdrHistogram = None
 
-@dataclass
+# How often the progress bar is redrawn. Refreshing on a timer instead of
+# once per completed request keeps tqdm's locking off the request path.
+PBAR_REFRESH_INTERVAL_S = 0.2
+
+# Sample count above which latency percentiles are aggregated in fixed-size
+# HDR histograms instead of per-sample arrays, if hdrhistogram is installed.
+HDR_SAMPLE_THRESHOLD = 100_000
+# Histogram range: 1 us to 6 hours, 3 significant digits. The upper bound
+# matches AIOHTTP_TIMEOUT, since HdrHistogram silently drops values that are
+# recorded beyond its range.
+HDR_MAX_LATENCY_US = 21_600_000_000
+
+
+@dataclass(frozen=True)
 class BenchmarkMetrics:
+    # Manual __slots__ (dataclass slots=True needs Python 3.10+): instances
+    # store their 27 fields in fixed slots instead of a per-instance dict,
+    # and frozen instances cannot be mutated after calculate_metrics.
+    __slots__ = (
+        "completed",
+        "successful_rate",
+        "total_input",
+        "total_output",
+        "mean_input_tokens",
+        "mean_output_tokens",
+        "request_throughput",
+        "in_out_throughput",
+        "output_throughput",
+        "min_ttft_ms",
+        "max_ttft_ms",
+        "mean_ttft_ms",
+        "median_ttft_ms",
+        "p90_ttft_ms",
+        "p99_ttft_ms",
+        "min_tpot_ms",
+        "max_tpot_ms",
+        "mean_tpot_ms",
+        "median_tpot_ms",
+        "p90_tpot_ms",
+        "p99_tpot_ms",
+        "min_e2e_ms",
+        "max_e2e_ms",
+        "mean_e2e_ms",
+        "median_e2e_ms",
+        "p90_e2e_ms",
+        "p99_e2e_ms",
+    )
+
     completed: int
     successful_rate: float
     total_input: int
@@ -68,63 +125,253 @@ class BenchmarkMetrics:
     p99_e2e_ms: float
 
 
+# Below this core count the batched tokenizer call scales well on its own;
+# past it, sharding across worker processes keeps tokenization throughput
+# from collapsing under the tokenizer's internal lock contention.
+MIN_CPUS_FOR_TOKENIZER_POOL = 16
+# Don't bother spinning up worker processes for small batches.
+MIN_TEXTS_FOR_TOKENIZER_POOL = 4096
+
+_worker_tokenizer = None
+
+
+def _init_worker_tokenizer(tokenizer_id: str, trust_remote_code: bool):
+    # Each pool worker holds its own tokenizer instance so workers do not
+    # contend on shared tokenizer state.
+    global _worker_tokenizer
+    _worker_tokenizer = get_tokenizer(tokenizer_id,
+                                      trust_remote_code=trust_remote_code)
+
+
+def _tokenize_shard(texts: List[str]) -> List[int]:
+    return [len(ids) for ids in _worker_tokenizer(texts).input_ids]
+
+
+_tokenizer_pool: Optional[ProcessPoolExecutor] = None
+_tokenizer_pool_key: Optional[Tuple[str, bool]] = None
+
+
+def _get_tokenizer_pool(tokenizer_id: str, trust_remote_code: bool,
+                        num_workers: int) -> ProcessPoolExecutor:
+    # Spawning the workers and re-loading the tokenizer in every initializer
+    # is a multi-second fixed cost, so the pool is created once and reused
+    # across batches for as long as the tokenizer stays the same.
+    global _tokenizer_pool, _tokenizer_pool_key
+    key = (tokenizer_id, trust_remote_code)
+    if _tokenizer_pool is None or _tokenizer_pool_key != key:
+        if _tokenizer_pool is not None:
+            _tokenizer_pool.shutdown()
+        _tokenizer_pool = ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker_tokenizer,
+            initargs=key)
+        _tokenizer_pool_key = key
+    return _tokenizer_pool
+
+
+def batch_tokenize_lens(
+    texts: List[str],
+    tokenizer: PreTrainedTokenizerBase,
+    trust_remote_code: bool = False,
+) -> List[int]:
+    num_workers = os.cpu_count() or 1
+    if (num_workers < MIN_CPUS_FOR_TOKENIZER_POOL
+            or len(texts) < MIN_TEXTS_FOR_TOKENIZER_POOL):
+        return [len(ids) for ids in tokenizer(texts).input_ids]
+
+    # Shard the texts across the shared process pool, whose workers each
+    # hold their own tokenizer; contiguous shards keep the results in input
+    # order.
+    shard_size = (len(texts) + num_workers - 1) // num_workers
+    shards = [
+        texts[i:i + shard_size] for i in range(0, len(texts), shard_size)
+    ]
+    pool = _get_tokenizer_pool(tokenizer.name_or_path, trust_remote_code,
+                               num_workers)
+    token_lens: List[int] = []
+    for shard_lens in pool.map(_tokenize_shard, shards):
+        token_lens.extend(shard_lens)
+    return token_lens
+
+
 def sample_sharegpt_requests(
     dataset_path: str,
     num_requests: int,
     tokenizer: PreTrainedTokenizerBase,
     fixed_output_len: Optional[int] = None,
+    trust_remote_code: bool = False,
 ) -> List[Tuple[str, int, int]]:
     # print("[I] Sampling requests...")
     if fixed_output_len is not None and fixed_output_len < 4:
         raise ValueError("output_len too small")
 
-    # Load the dataset.
-    with open(dataset_path) as f:
-        dataset = json.load(f)
-    # Filter out the conversations with less than 2 turns.
-    dataset = [data for data in dataset if len(data["conversations"]) >= 2]
-    # Only keep the first two turns of each conversation.
+    # Load the dataset. orjson parses the file in C, and the turn
+    # extraction is fused with the minimum-turn filter so only one
+    # intermediate list is built.
+    with open(dataset_path, "rb") as f:
+        dataset = orjson.loads(f.read())
+    # Only keep the first two turns of conversations with at least 2 turns.
     dataset = [(data["conversations"][0]["value"],
-                data["conversations"][1]["value"]) for data in dataset]
+                data["conversations"][1]["value"]) for data in dataset
+               if len(data["conversations"]) >= 2]
 
     # Shuffle the dataset.
     random.shuffle(dataset)
 
-    # Filter out sequences that are too long or too short
+    # Filter out sequences that are too long or too short. The prompts and
+    # completions are tokenized in batches: a single tokenizer call over a
+    # list amortizes the per-call overhead and lets the fast tokenizer
+    # parallelize internally. Tokenize a generous slice of the shuffled
+    # dataset at a time instead of the whole corpus, since only
+    # `num_requests` samples survive the filters.
     filtered_dataset: List[Tuple[str, int, int]] = []
-    for i in range(len(dataset)):
+    chunk_size = max(2 * num_requests, 1024)
+    for start in range(0, len(dataset), chunk_size):
         if len(filtered_dataset) == num_requests:
             break
 
-        # Tokenize the prompts and completions.
-        prompt = dataset[i][0]
-        prompt_token_ids = tokenizer(prompt).input_ids
-        completion = dataset[i][1]
-        completion_token_ids = tokenizer(completion).input_ids
-        prompt_len = len(prompt_token_ids)
-        output_len = len(completion_token_ids
-                         ) if fixed_output_len is None else fixed_output_len
-        if prompt_len < 4 or output_len < 4:
-            # Prune too short sequences.
-            continue
-        if prompt_len > 1024 or prompt_len + output_len > 2048:
-            # Prune too long sequences.
-            continue
-        filtered_dataset.append((prompt, prompt_len, output_len))
+        chunk = dataset[start:start + chunk_size]
+        # Tokenize the prompts and completions in one batch.
+        token_lens = batch_tokenize_lens(
+            [prompt for prompt, _ in chunk] +
+            [completion for _, completion in chunk],
+            tokenizer,
+            trust_remote_code=trust_remote_code)
+        prompt_lens = token_lens[:len(chunk)]
+        completion_lens = token_lens[len(chunk):]
+        for i in range(len(chunk)):
+            if len(filtered_dataset) == num_requests:
+                break
+
+            prompt_len = prompt_lens[i]
+            output_len = completion_lens[
+                i] if fixed_output_len is None else fixed_output_len
+            if prompt_len < 4 or output_len < 4:
+                # Prune too short sequences.
+                continue
+            if prompt_len > 1024 or prompt_len + output_len > 2048:
+                # Prune too long sequences.
+                continue
+            filtered_dataset.append((chunk[i][0], prompt_len, output_len))
 
     return filtered_dataset
 
 
-def get_request(
+def sample_sonnet_requests(
+    dataset_path: str,
+    num_requests: int,
+    input_len: int,
+    output_len: int,
+    prefix_len: int,
+    tokenizer: PreTrainedTokenizerBase,
+    trust_remote_code: bool = False,
+) -> List[Tuple[str, int, int]]:
+    assert (
+        input_len > prefix_len
+    ), "'args.sonnet-input-len' must be greater than 'args.sonnet-prefix-len'."
+
+    # Load the dataset.
+    with open(dataset_path) as f:
+        poem_lines = f.readlines()
+
+    # Tokenize the poem lines once to size the prompts in tokens.
+    poem_token_counts = [len(ids) for ids in tokenizer(poem_lines).input_ids]
+    average_poem_len = sum(poem_token_counts) / len(poem_token_counts)
+
+    # Base prefix for all requests.
+    base_prompt = "Pick as many lines as you can from these poem lines:\n"
+    base_prompt_formatted = tokenizer.apply_chat_template(
+        [{"role": "user", "content": base_prompt}],
+        add_generation_prompt=True,
+        tokenize=False)
+    base_prompt_offset = len(tokenizer(base_prompt_formatted).input_ids)
+
+    assert (input_len > base_prompt_offset
+            ), f"Please set 'args.sonnet-input-len' higher than {base_prompt_offset}."
+    num_input_lines = round((input_len - base_prompt_offset) /
+                            average_poem_len)
+
+    # First approximately `prefix_len` tokens of every request are the same.
+    assert (prefix_len > base_prompt_offset
+            ), f"Please set 'args.sonnet-prefix-len' higher than {base_prompt_offset}."
+    num_prefix_lines = round((prefix_len - base_prompt_offset) /
+                             average_poem_len)
+    prefix_lines = poem_lines[:num_prefix_lines]
+
+    # Build every message first, then format and tokenize them with one
+    # batched apply_chat_template call and one batched tokenizer call
+    # instead of two calls per request.
+    sampled_messages = [[{
+        "role":
+        "user",
+        "content":
+        base_prompt + "".join(prefix_lines + random.sample(
+            poem_lines, num_input_lines - num_prefix_lines)),
+    }] for _ in range(num_requests)]
+    prompts_formatted = tokenizer.apply_chat_template(
+        sampled_messages, add_generation_prompt=True, tokenize=False)
+    prompt_lens = batch_tokenize_lens(prompts_formatted,
+                                      tokenizer,
+                                      trust_remote_code=trust_remote_code)
+
+    return [(prompt, prompt_len, output_len)
+            for prompt, prompt_len in zip(prompts_formatted, prompt_lens)]
+
+
+async def get_request_async(
     input_requests: List[Tuple[str, int, int]],
-):
-    input_requests = iter(input_requests)
-    for request in input_requests:
-        yield request
+    request_rate: float,
+    order: Optional[Sequence[int]] = None,
+) -> AsyncGenerator[Tuple[str, int, int], None]:
+    # `order` indexes into the shared request list, so callers can give
+    # every worker its own request order without copying the list itself.
+    if order is None:
+        order = range(len(input_requests))
+
+    # No pacing: yield requests back-to-back without any per-iteration
+    # rate check.
+    if math.isinf(request_rate):
+        for i in order:
+            yield input_requests[i]
+        return
+
+    # Draw the whole Poisson arrival schedule with one vectorized call
+    # instead of one RNG call per request, and sleep against the cumulative
+    # timeline so pacing does not drift as per-request overhead accumulates.
+    schedule = np.random.exponential(1.0 / request_rate,
+                                     size=len(order)).cumsum()
+    start = time.perf_counter()
+    for i, arrival in zip(order, schedule):
+        delay = start + arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield input_requests[i]
+
+
+def latency_stats_ms(samples: np.ndarray) -> Tuple[float, ...]:
+    # Compute (min, max, mean, median, p90, p99) in milliseconds with a
+    # single percentile pass over the array instead of one pass per statistic.
+    if samples.size == 0:
+        # e.g. ttfts is empty if streaming is not supported by backend
+        return (0.0,) * 6
+    q = np.percentile(samples, [0, 100, 50, 90, 99]) * 1000
+    return (q[0], q[1], samples.mean() * 1000, q[2], q[3], q[4])
+
+
+def histogram_stats_ms(hist) -> Tuple[float, ...]:
+    # Same (min, max, mean, median, p90, p99) layout as latency_stats_ms,
+    # read from an HdrHistogram whose values are recorded in microseconds.
+    if hist.get_total_count() == 0:
+        return (0.0,) * 6
+    return (hist.get_min_value() / 1000.0,
+            hist.get_max_value() / 1000.0,
+            hist.get_mean_value() / 1000.0,
+            hist.get_value_at_percentile(50) / 1000.0,
+            hist.get_value_at_percentile(90) / 1000.0,
+            hist.get_value_at_percentile(99) / 1000.0)
 
 
 def calculate_metrics(
-    input_requests: List[Tuple[str, int, int]],
     outputs: List[RequestFuncOutput],
     dur_s: float,
     tokenizer: PreTrainedTokenizerBase,
@@ -132,27 +379,80 @@ def calculate_metrics(
     actual_output_lens = []
     total_input_tokens = 0
     completed = 0
-    tpots = []
-    ttfts = []
-    e2es = []
+    # For very large runs, record samples into fixed-size HDR histograms so
+    # memory stays constant regardless of sample count; otherwise the sample
+    # arrays are built after the loop with np.fromiter and exact counts.
+    use_hdr = (HdrHistogram is not None
+               and len(outputs) >= HDR_SAMPLE_THRESHOLD)
+    if use_hdr:
+        ttft_hist = HdrHistogram(1, HDR_MAX_LATENCY_US, 3)
+        tpot_hist = HdrHistogram(1, HDR_MAX_LATENCY_US, 3)
+        e2e_hist = HdrHistogram(1, HDR_MAX_LATENCY_US, 3)
+    num_tpots = 0
+    # Streaming backends already counted output tokens as they arrived, so
+    # only outputs without a token count fall back to re-tokenizing the
+    # generated text, with a single batched call.
+    fallback_idx = [
+        i for i in range(len(outputs))
+        if outputs[i].success and outputs[i].output_token_count == 0
+    ]
+    fallback_lens = dict(
+        zip(fallback_idx,
+            (len(ids) for ids in tokenizer(
+                [outputs[i].generated_text
+                 for i in fallback_idx]).input_ids))) if fallback_idx else {}
     for i in range(len(outputs)):
         if outputs[i].success:
-            output_len = len(tokenizer(outputs[i].generated_text).input_ids)
+            output_len = outputs[i].output_token_count or fallback_lens[i]
             actual_output_lens.append(output_len)
-            total_input_tokens += input_requests[i][1]
+            # Workers consume requests in their own permuted order (and may
+            # stop early on thread_stop_time), so outputs cannot be paired
+            # with input_requests by index; each output carries its own
+            # prompt length.
+            total_input_tokens += outputs[i].prompt_len
             if output_len > 1:
-                tpots.append(
-                    (outputs[i].latency - outputs[i].ttft) / (output_len - 1))
-                
-            ttfts.append(outputs[i].ttft)
-            e2es.append(outputs[i].latency)
+                if use_hdr:
+                    tpot_hist.record_value(
+                        int((outputs[i].latency - outputs[i].ttft) /
+                            (output_len - 1) * 1e6))
+                num_tpots += 1
+
+            if use_hdr:
+                ttft_hist.record_value(int(outputs[i].ttft * 1e6))
+                e2e_hist.record_value(int(outputs[i].latency * 1e6))
             completed += 1
-            
+
         else:
             actual_output_lens.append(0)
 
     total_output_tokens = sum(actual_output_lens)
-    
+
+    if use_hdr:
+        ttft_stats = histogram_stats_ms(ttft_hist)
+        tpot_stats = histogram_stats_ms(tpot_hist)
+        e2e_stats = histogram_stats_ms(e2e_hist)
+    else:
+        # np.fromiter with the counts gathered above fills preallocated
+        # C buffers directly, skipping the list materialization and the
+        # asarray copy inside np.percentile.
+        ttfts = np.fromiter((output.ttft for output in outputs
+                             if output.success),
+                            dtype=np.float64,
+                            count=completed)
+        e2es = np.fromiter((output.latency for output in outputs
+                            if output.success),
+                           dtype=np.float64,
+                           count=completed)
+        tpots = np.fromiter(
+            ((output.latency - output.ttft) / (output_len - 1)
+             for output, output_len in zip(outputs, actual_output_lens)
+             if output.success and output_len > 1),
+            dtype=np.float64,
+            count=num_tpots)
+        ttft_stats = latency_stats_ms(ttfts)
+        tpot_stats = latency_stats_ms(tpots)
+        e2e_stats = latency_stats_ms(e2es)
+
     metrics = BenchmarkMetrics(
         completed=completed,
         successful_rate=completed / len(outputs),
@@ -163,27 +463,27 @@ def calculate_metrics(
         request_throughput=completed / dur_s,
         in_out_throughput=(total_input_tokens + total_output_tokens) / dur_s,
         output_throughput=total_output_tokens / dur_s,
-        
-        min_ttft_ms=np.min(ttfts or 0) * 1000,  # ttfts is empty if streaming is not supported by backend
-        max_ttft_ms=np.max(ttfts or 0) * 1000,
-        mean_ttft_ms=np.mean(ttfts or 0) * 1000,
-        median_ttft_ms=np.median(ttfts or 0) * 1000,
-        p90_ttft_ms=np.percentile(ttfts or 0, 90) * 1000,
-        p99_ttft_ms=np.percentile(ttfts or 0, 99) * 1000,
-        
-        min_tpot_ms=np.min(tpots) * 1000,
-        max_tpot_ms=np.max(tpots) * 1000,
-        mean_tpot_ms=np.mean(tpots) * 1000,
-        median_tpot_ms=np.median(tpots) * 1000,
-        p90_tpot_ms=np.percentile(tpots, 90) * 1000,
-        p99_tpot_ms=np.percentile(tpots, 99) * 1000,
-        
-        min_e2e_ms=np.min(e2es) * 1000,
-        max_e2e_ms=np.max(e2es) * 1000,
-        mean_e2e_ms=np.mean(e2es) * 1000,
-        median_e2e_ms=np.median(e2es) * 1000,
-        p90_e2e_ms=np.percentile(e2es, 90) * 1000,
-        p99_e2e_ms=np.percentile(e2es, 99) * 1000,
+
+        min_ttft_ms=ttft_stats[0],
+        max_ttft_ms=ttft_stats[1],
+        mean_ttft_ms=ttft_stats[2],
+        median_ttft_ms=ttft_stats[3],
+        p90_ttft_ms=ttft_stats[4],
+        p99_ttft_ms=ttft_stats[5],
+
+        min_tpot_ms=tpot_stats[0],
+        max_tpot_ms=tpot_stats[1],
+        mean_tpot_ms=tpot_stats[2],
+        median_tpot_ms=tpot_stats[3],
+        p90_tpot_ms=tpot_stats[4],
+        p99_tpot_ms=tpot_stats[5],
+
+        min_e2e_ms=e2e_stats[0],
+        max_e2e_ms=e2e_stats[1],
+        mean_e2e_ms=e2e_stats[2],
+        median_e2e_ms=e2e_stats[3],
+        p90_e2e_ms=e2e_stats[4],
+        p99_e2e_ms=e2e_stats[5],
     )
 
     return metrics, actual_output_lens
@@ -196,56 +496,94 @@ def dump_metrics_and_results(
     benchmark_duration: float
 ):
     # success_rate, qps, avg_inlen, avg_outlen, o_tps, io_tps, min_ttft, max_ttft, mean_ttft, median_ttft, p90_ttft, p99_ttft, min_tpot, max_tpot, mean_tpot, median_tpot, p90_tpot, p99_tpot, min_tpr, max_tpr, mean_tpr, median_tpr, p90_tpr, p99_tpr
-    csv_line = ""
-    csv_line += f"{metrics.successful_rate:.3f},"
-    csv_line += f"{metrics.request_throughput:.3f},"
-    csv_line += f"{metrics.mean_input_tokens:.3f},"
-    csv_line += f"{metrics.mean_output_tokens:.3f},"
-    csv_line += f"{metrics.output_throughput:.3f},"
-    csv_line += f"{metrics.in_out_throughput:.3f},"
-    csv_line += f"{metrics.min_ttft_ms:.3f},"
-    csv_line += f"{metrics.max_ttft_ms:.3f},"
-    csv_line += f"{metrics.mean_ttft_ms:.3f},"
-    csv_line += f"{metrics.median_ttft_ms:.3f},"
-    csv_line += f"{metrics.p90_ttft_ms:.3f},"
-    csv_line += f"{metrics.p99_ttft_ms:.3f},"
-    csv_line += f"{metrics.min_tpot_ms:.3f},"
-    csv_line += f"{metrics.max_tpot_ms:.3f},"
-    csv_line += f"{metrics.mean_tpot_ms:.3f},"
-    csv_line += f"{metrics.median_tpot_ms:.3f},"
-    csv_line += f"{metrics.p90_tpot_ms:.3f},"
-    csv_line += f"{metrics.p99_tpot_ms:.3f},"
-    csv_line += f"{metrics.min_e2e_ms:.3f},"
-    csv_line += f"{metrics.max_e2e_ms:.3f},"
-    csv_line += f"{metrics.mean_e2e_ms:.3f},"
-    csv_line += f"{metrics.median_e2e_ms:.3f},"
-    csv_line += f"{metrics.p90_e2e_ms:.3f},"
-    csv_line += f"{metrics.p99_e2e_ms:.3f}"
+    csv_fields = (
+        metrics.successful_rate,
+        metrics.request_throughput,
+        metrics.mean_input_tokens,
+        metrics.mean_output_tokens,
+        metrics.output_throughput,
+        metrics.in_out_throughput,
+        metrics.min_ttft_ms,
+        metrics.max_ttft_ms,
+        metrics.mean_ttft_ms,
+        metrics.median_ttft_ms,
+        metrics.p90_ttft_ms,
+        metrics.p99_ttft_ms,
+        metrics.min_tpot_ms,
+        metrics.max_tpot_ms,
+        metrics.mean_tpot_ms,
+        metrics.median_tpot_ms,
+        metrics.p90_tpot_ms,
+        metrics.p99_tpot_ms,
+        metrics.min_e2e_ms,
+        metrics.max_e2e_ms,
+        metrics.mean_e2e_ms,
+        metrics.median_e2e_ms,
+        metrics.p90_e2e_ms,
+        metrics.p99_e2e_ms,
+    )
+    csv_line = ",".join(f"{field:.3f}" for field in csv_fields)
     print(f"CSV format output:{csv_line}")
+
+    # Transpose the outputs into struct-of-arrays form in a single pass,
+    # instead of one list comprehension over all outputs per field.
+    input_lens: List[int] = []
+    ttfts: List[float] = []
+    itls: List[List[float]] = []
+    generated_texts: List[str] = []
+    errors: List[str] = []
+    for output in outputs:
+        input_lens.append(output.prompt_len)
+        ttfts.append(output.ttft)
+        itls.append(output.itl)
+        generated_texts.append(output.generated_text)
+        errors.append(output.error)
+
+    benchmark_result = {
+        "duration": benchmark_duration,
+        "completed": metrics.completed,
+        "total_input_tokens": metrics.total_input,
+        "total_output_tokens": metrics.total_output,
+        "request_throughput": metrics.request_throughput,
+        "output_throughput": metrics.output_throughput,
+        "input_lens": input_lens,
+        "output_lens": actual_output_lens,
+        "ttfts": ttfts,
+        "itls": itls,
+        "generated_texts": generated_texts,
+        "errors": errors,
+    }
+    return benchmark_result
     
 
-def benchmark(
+async def benchmark(
     backend: str,
     api_url: str,
     model_id: str,
-    tokenizer: PreTrainedTokenizerBase,
     input_requests: List[Tuple[str, int, int]],
     best_of: int,
     use_beam_search: bool,
+    session: aiohttp.ClientSession,
+    request_rate: float = float("inf"),
+    request_order: Optional[Sequence[int]] = None,
+    ramp_up_time: float = 0.0,
+    thread_stop_time: float = 0.0,
     thread_id: int = -1,
+    progress: Optional[List[int]] = None,
 ):
     if backend in REQUEST_FUNCS:
         request_func = REQUEST_FUNCS.get(backend)
     else:
         raise ValueError(f"Unknown backend: {backend}")
 
-
+    await asyncio.sleep(ramp_up_time)
     benchmark_start_time = time.perf_counter()
     outputs = []
-    for request in get_request(input_requests):
-        if args.thread_stop_time > 0 and time.perf_counter() - benchmark_start_time >= args.thread_stop_time:
+    async for request in get_request_async(input_requests, request_rate,
+                                           order=request_order):
+        if thread_stop_time > 0 and time.perf_counter() - benchmark_start_time >= thread_stop_time:
             break
-        
+
         prompt, prompt_len, output_len = request
         request_func_input = RequestFuncInput(
             model=model_id,
@@ -256,48 +594,82 @@ def benchmark(
             best_of=best_of,
             use_beam_search=use_beam_search,
         )
-        outputs.append(request_func(request_func_input=request_func_input))
-        
+        outputs.append(await request_func(
+            request_func_input=request_func_input, session=session))
+        if progress is not None:
+            progress[0] += 1
+
     return outputs
 
 
-class benchThread(threading.Thread):
-    def __init__(self, thread_id, ramp_up_time, backend, api_url, model_id, tokenizer, input_requests,
-                 best_of, use_beam_search):
-        super(benchThread, self).__init__()
-        self.thread_id = thread_id
-        self.ramp_up_time = ramp_up_time
-        self.backend = backend
-        self.api_url = api_url
-        self.model_id = model_id
-        self.tokenizer = tokenizer
-        self.input_requests = input_requests
-        self.best_of = best_of
-        self.use_beam_search = use_beam_search
-        
-    def run(self):
-        time.sleep(self.ramp_up_time)
-        self.outputs = benchmark(
-                backend=self.backend,
-                api_url=self.api_url,
-                model_id=self.model_id,
-                tokenizer=self.tokenizer,
-                input_requests=self.input_requests,
-                best_of=self.best_of,
-                use_beam_search=self.use_beam_search,
-                thread_id=self.thread_id,
-            )
-        
-    def get_result(self):
-        self.join()
-        return self.outputs
+async def refresh_pbar(pbar: tqdm, progress: List[int]):
+    while True:
+        pbar.n = progress[0]
+        pbar.refresh()
+        await asyncio.sleep(PBAR_REFRESH_INTERVAL_S)
+
+
+async def run_benchmarks(
+    args: argparse.Namespace,
+    api_url: str,
+    model_id: str,
+    input_requests: List[Tuple[str, int, int]],
+) -> List[RequestFuncOutput]:
+    # One event loop with `num_threads` worker coroutines replaces the old
+    # one-OS-thread-per-worker design: requests stream through a single
+    # shared connection pool with keep-alive, and idle HTTP waits no longer
+    # cost GIL round-trips or kernel context switches. Each worker still
+    # issues its requests serially, so concurrency stays bounded by
+    # `num_threads` as before.
+    connector = aiohttp.TCPConnector(limit=args.num_threads)
+    async with aiohttp.ClientSession(connector=connector,
+                                     timeout=AIOHTTP_TIMEOUT) as session:
+        # Completed-request counter shared by all workers; a background task
+        # redraws the progress bar from it on a timer so the request path
+        # never takes tqdm's lock.
+        progress = [0]
+        pbar = None if args.disable_tqdm else tqdm(
+            total=args.num_threads * len(input_requests))
+        tasks = []
+        for i in range(args.num_threads):
+            # Shuffle a compact index permutation per worker; the request
+            # tuples themselves are shared by all workers instead of being
+            # copied into per-worker lists.
+            worker_order = np.random.permutation(len(input_requests))
+            print(f"input_requests[0]: {input_requests[worker_order[0]]}")
+            tasks.append(
+                asyncio.create_task(
+                    benchmark(
+                        backend=args.backend,
+                        api_url=api_url,
+                        model_id=model_id,
+                        input_requests=input_requests,
+                        best_of=args.best_of,
+                        use_beam_search=args.use_beam_search,
+                        session=session,
+                        request_rate=args.request_rate,
+                        request_order=worker_order,
+                        ramp_up_time=i * args.ramp_up_time / args.num_threads,
+                        thread_stop_time=args.thread_stop_time,
+                        thread_id=i,
+                        progress=progress,
+                    )))
+        refresh_task = None
+        if pbar is not None:
+            refresh_task = asyncio.create_task(refresh_pbar(pbar, progress))
+        results = await asyncio.gather(*tasks)
+        if pbar is not None:
+            refresh_task.cancel()
+            pbar.n = progress[0]
+            pbar.close()
+
+    return [output for outputs in results for output in outputs]
 
 
 def main(args: argparse.Namespace):
     print(args)
     assert args.num_threads > 0, "Number of threads must be greater than 0."
     
-    backend = args.backend
     model_id = args.model
     tokenizer_id = args.tokenizer if args.tokenizer is not None else args.model
 
@@ -308,41 +680,69 @@ def main(args: argparse.Namespace):
     tokenizer = get_tokenizer(tokenizer_id, trust_remote_code=args.trust_remote_code)
 
     # sample requests
-    input_requests = sample_sharegpt_requests(
-        dataset_path=args.dataset_path,
-        num_requests=args.num_prompts,
-        tokenizer=tokenizer,
-        fixed_output_len=args.sharegpt_output_len,
-    )               
+    if args.dataset_name == "sharegpt":
+        input_requests = sample_sharegpt_requests(
+            dataset_path=args.dataset_path,
+            num_requests=args.num_prompts,
+            tokenizer=tokenizer,
+            fixed_output_len=args.sharegpt_output_len,
+            trust_remote_code=args.trust_remote_code,
+        )
+    elif args.dataset_name == "sonnet":
+        input_requests = sample_sonnet_requests(
+            dataset_path=args.dataset_path,
+            num_requests=args.num_prompts,
+            input_len=args.sonnet_input_len,
+            output_len=args.sonnet_output_len,
+            prefix_len=args.sonnet_prefix_len,
+            tokenizer=tokenizer,
+            trust_remote_code=args.trust_remote_code,
+        )
+    else:
+        raise ValueError(f"Unknown dataset: {args.dataset_name}")
 
     # start benchmark
     benchmark_start_time = time.perf_counter()
-    threads = []
-    for i in range(args.num_threads):
-        random.shuffle(input_requests)
-        print(f"input_requests[0]: {input_requests[0]}")
-        thread = benchThread(i, i * args.ramp_up_time / args.num_threads, backend, api_url, model_id, tokenizer, input_requests,
-                                args.best_of, args.use_beam_search)
-        thread.start()
-        threads.append(thread)
-
-    for thread in threads:
-        thread.join()
+    all_outputs = asyncio.run(
+        run_benchmarks(
+            args=args,
+            api_url=api_url,
+            model_id=model_id,
+            input_requests=input_requests,
+        ))
     benchmark_duration = time.perf_counter() - benchmark_start_time
 
-    # gather benchmark result
-    all_outputs = []
-    for thread in threads:
-        outputs = thread.get_result()
-        all_outputs += outputs
-        
     metrics, actual_output_lens = calculate_metrics(
-        input_requests=input_requests,
         outputs=all_outputs,
         dur_s=benchmark_duration,
         tokenizer=tokenizer,
     )
-    benchmark_result = dump_metrics_and_results(metrics, actual_output_lens, all_outputs, benchmark_duration)   
+    benchmark_result = dump_metrics_and_results(metrics, actual_output_lens, all_outputs, benchmark_duration)
+
+    if args.save_result:
+        # Save config and results to json.
+        result_json = {
+            "date": datetime.now().strftime("%Y%m%d-%H%M%S"),
+            "backend": args.backend,
+            "model_id": model_id,
+            "tokenizer_id": tokenizer_id,
+            "num_prompts": args.num_prompts,
+            "num_threads": args.num_threads,
+            "best_of": args.best_of,
+            "use_beam_search": args.use_beam_search,
+        }
+        result_json.update(benchmark_result)
+
+        base_model_id = model_id.split("/")[-1]
+        file_name = f"{args.backend}-{args.num_threads}threads-{base_model_id}-{result_json['date']}.json"  #noqa
+        if args.result_dir:
+            file_name = os.path.join(args.result_dir, file_name)
+        # orjson serializes straight to UTF-8 bytes in C, so the whole
+        # payload is written with one binary write; OPT_SERIALIZE_NUMPY
+        # handles any ndarray values without manual .tolist() calls.
+        with open(file_name, "wb") as outfile:
+            outfile.write(
+                orjson.dumps(result_json, option=orjson.OPT_SERIALIZE_NUMPY))
 
 
 if __name__ == "__main__":
@@ -409,11 +809,36 @@ if __name__ == "__main__":
         default=None,
         help="Output length for each request. Overrides the output length "
         "from the ShareGPT dataset.")
+    parser.add_argument(
+        "--sonnet-input-len",
+        type=int,
+        default=550,
+        help="Number of input tokens per request, used only for sonnet "
+        "dataset.")
+    parser.add_argument(
+        "--sonnet-output-len",
+        type=int,
+        default=150,
+        help="Number of output tokens per request, used only for sonnet "
+        "dataset.")
+    parser.add_argument(
+        "--sonnet-prefix-len",
+        type=int,
+        default=200,
+        help="Number of prefix tokens per request, used only for sonnet "
+        "dataset.")
     parser.add_argument(
         "--trust-remote-code",
         action="store_true",
         help="Trust remote code from huggingface",
     )
+    parser.add_argument(
+        "--request-rate",
+        type=float,
+        default=float("inf"),
+        help="Number of requests per second per worker, following a Poisson "
+        "arrival process. If this is inf, requests are sent back-to-back.",
+    )
     parser.add_argument(
         "--num-threads",
         type=int,
@@ -426,6 +851,23 @@ if __name__ == "__main__":
         default=1,
         help="Ramp up time in seconds for each thread.",
     )
+    parser.add_argument(
+        "--save-result",
+        action="store_true",
+        help="Specify to save benchmark results to a json file.",
+    )
+    parser.add_argument(
+        "--result-dir",
+        type=str,
+        default=None,
+        help="Specify directory to save benchmark json results."
+        "If not specified, results are saved in the current directory.",
+    )
+    parser.add_argument(
+        "--disable-tqdm",
+        action="store_true",
+        help="Specify to disable tqdm progress bar.",
+    )
     parser.add_argument(
         "--thread-stop-time",
         type=float,
@@ -51,6 +51,7 @@ case $PARAM in
     # pip install -r requirements_vllm042.txt
     pip install https://github.com/vllm-project/vllm/releases/download/v0.4.2/vllm-0.4.2+cu118-cp39-cp39-manylinux1_x86_64.whl --extra-index-url https://download.pytorch.org/whl/cu118 
     pip install flash_attn==2.5.8
+    pip install orjson
     ;;
   "12")
     BENCHMARK_LLM="$SCRIPT_DIR/python/benchmark_latency.py"
@@ -58,6 +59,7 @@ case $PARAM in
     # pip install -r requirements_vllm043.txt
     pip install vllm==0.4.3
     pip install vllm_flash_attn
+    pip install orjson
     ;;
   *)
     echo "[ERROR] Unsupported CUDA version: $PARAM. Only 11 and 12 are supported."